@@ -9,7 +9,7 @@ import os
 import logging
 from pathlib import Path
 from typing import Optional, Dict, Any, List
-from dotenv import load_dotenv
+from app.utils.env import ensure_loaded
 import httpx
 import asyncio
 
@@ -24,7 +24,7 @@ _env_path = _root_dir / ".env"
 
 if _env_path.exists():
     logger.info(f"Loading environment variables from: {_env_path}")
-    load_dotenv(
+    ensure_loaded(
         dotenv_path=_env_path, override=True
     )  # Override system vars if .env exists
 else:
@@ -32,7 +32,7 @@ else:
         f".env file not found at {_env_path}. Relying solely on system environment variables."
     )
     # Attempt to load from system environment anyway
-    load_dotenv(override=False)
+    ensure_loaded(override=False)
 
 
 # --- Settings Class ---
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from typing import List, Dict
 import os
-from dotenv import load_dotenv
+from app.utils.env import ensure_loaded
 from supabase import create_client, Client
 from app.services.dependencies import get_current_user
 from app.services.embedding_service import (
@@ -12,7 +12,7 @@ from app.services.embedding_service import (
 import uuid
 
 # Load environment variables
-load_dotenv()
+ensure_loaded()
 
 # Supabase client
 supabase_url = os.getenv("SUPABASE_URL")
@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
 from typing import Optional, Dict
 import os
-from dotenv import load_dotenv
+from app.utils.env import ensure_loaded
 from supabase import create_client, Client
 from app.services.dependencies import get_current_user
 from app.services.payment_service import create_checkout_session, handle_webhook_event
 from pydantic import BaseModel
 
 # Load environment variables
-load_dotenv()
+ensure_loaded()
 
 # Supabase client
 supabase_url = os.getenv("SUPABASE_URL")
@@ -1,11 +1,11 @@
 import os
 import stripe
-from dotenv import load_dotenv
+from app.utils.env import ensure_loaded
 from fastapi import HTTPException, status
 from typing import Dict
 
 # Load environment variables
-load_dotenv()
+ensure_loaded()
 
 # Stripe configuration
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
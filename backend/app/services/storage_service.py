@@ -6,7 +6,7 @@ from typing import BinaryIO, Union, Optional, Dict, Any, List
 from enum import Enum
 from abc import ABC, abstractmethod
 from fastapi import HTTPException, status
-from dotenv import load_dotenv
+from app.utils.env import ensure_loaded
 from supabase import create_client, Client
 import boto3
 from botocore.exceptions import ClientError
@@ -19,7 +19,7 @@ import aioboto3
 import httpx
 
 # Load environment variables
-load_dotenv()
+ensure_loaded()
 
 # Import settings from centralized config
 from app.config.settings import settings
@@ -1,18 +1,37 @@
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import uuid4
 import asyncio
+from dataclasses import dataclass
 from pinecone import Pinecone, ServerlessSpec
 from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class VectorRecord:
+    """A single vector to upsert, stored without a per-instance __dict__."""
+
+    __slots__ = ("id", "values", "metadata")
+
+    id: str
+    values: List[float]
+    metadata: Dict[str, Any]
+
+
 class VectorStoreService:
-    def __init__(self, pinecone_client=None):
+    def __init__(
+        self,
+        pinecone_client=None,
+        warmup_queries: Optional[List[Tuple[str, str]]] = None
+    ):
         """Initialize the vector store service with a Pinecone client.
 
         Args:
             pinecone_client: Initialized Pinecone client instance (optional)
+            warmup_queries: Optional (project_id, query_text) pairs to issue in the
+                background once the index is connected
 
         Raises:
             ValueError: If required settings are missing
@@ -52,9 +71,37 @@ class VectorStoreService:
             logger.error(f"Failed to connect to Pinecone index {self.index_name}: {str(e)}")
             raise ConnectionError(f"Invalid Pinecone index configuration: {str(e)}")
 
+        self._warmup_task = None
+        if warmup_queries:
+            try:
+                loop = asyncio.get_running_loop()
+                self._warmup_task = loop.create_task(self._warmup(warmup_queries))
+            except RuntimeError:
+                logger.info("No running event loop, skipping vector store warm-up")
+
+    async def _warmup(self, warmup_queries: List[Tuple[str, str]]) -> None:
+        """Issue common project queries so the first user query hits a warm index."""
+        # Imported lazily to keep the embedding stack out of the import path
+        from app.services.embedding_service import get_embedding_service
+
+        try:
+            embeddings = await get_embedding_service().generate_embeddings(
+                [query_text for _, query_text in warmup_queries]
+            )
+            for (project_id, _), embedding in zip(warmup_queries, embeddings):
+                await self.query_vectors(
+                    embedding,
+                    top_k=5,
+                    namespace=f"proj_{project_id}",
+                    filter={"project_id": str(project_id)}
+                )
+            logger.info(f"Vector store warm-up issued {len(embeddings)} queries")
+        except Exception as e:
+            logger.warning(f"Vector store warm-up failed: {str(e)}")
+
     async def upsert_vectors(
         self,
-        vectors: List[Dict[str, Any]],
+        vectors: List[VectorRecord],
         namespace: Optional[str] = None,
         batch_size: int = 100,
         timeout: int = 30
@@ -62,7 +109,7 @@ class VectorStoreService:
         """Upsert vectors into the specified Pinecone namespace in batches.
 
         Args:
-            vectors: List of vector dictionaries with id, values, and optional metadata
+            vectors: List of VectorRecord instances
             namespace: Target namespace (defaults to configured namespace)
             batch_size: Number of vectors to upsert in each batch
             timeout: Timeout in seconds for each batch operation
@@ -87,9 +134,9 @@ class VectorStoreService:
 
         # Validate vector format
         for i, vector in enumerate(vectors):
-            if not isinstance(vector, dict) or "id" not in vector or "values" not in vector:
+            if not isinstance(vector, VectorRecord):
                 logger.error(f"Invalid vector format at index {i}: {vector}")
-                raise ValueError("Each vector must be a dict with 'id' and 'values'")
+                raise ValueError("Each vector must be a VectorRecord")
 
         # Process in batches
         total_upserted = 0
@@ -101,7 +148,7 @@ class VectorStoreService:
                 # Use to_thread to make the blocking call non-blocking
                 await asyncio.to_thread(
                     self.index.upsert,
-                    vectors=batch,
+                    vectors=[(r.id, r.values, r.metadata) for r in batch],
                     namespace=ns,
                     async_req=False  # Updated param name in newer Pinecone versions
                 )
@@ -154,11 +201,7 @@ class VectorStoreService:
                 **metadata_base  # Include all base metadata
             }
             
-            vectors.append({
-                "id": vector_id,
-                "values": embedding,
-                "metadata": metadata
-            })
+            vectors.append(VectorRecord(vector_id, embedding, metadata))
             
         # Upsert the vectors
         return await self.upsert_vectors(
@@ -381,6 +424,46 @@ class VectorStoreService:
             logger.error(f"Failed to get index stats: {str(e)}")
             raise
 
+    async def wait_for_upsert(
+        self,
+        expected_count: int,
+        namespace: Optional[str] = None,
+        delays: Tuple[float, ...] = (0.1, 0.2, 0.4, 0.8, 1.6)
+    ) -> bool:
+        """Wait until a namespace reports at least `expected_count` vectors.
+
+        Polls describe_index_stats with exponential backoff instead of sleeping
+        for a fixed interval, so callers resume as soon as the upsert is indexed.
+
+        Args:
+            expected_count: Minimum vector count to wait for
+            namespace: Target namespace (defaults to configured namespace)
+            delays: Backoff delays in seconds between successive polls
+
+        Returns:
+            True if the count was reached, False if polling gave up
+        """
+        if not self.index:
+            raise ConnectionError("Pinecone index not initialized")
+
+        ns = namespace or self.namespace
+        vector_count = 0
+
+        for delay in (*delays, None):
+            stats = await asyncio.to_thread(self.index.describe_index_stats)
+            ns_stats = stats.get("namespaces", {}).get(ns)
+            vector_count = ns_stats.get("vector_count", 0) if ns_stats else 0
+            if vector_count >= expected_count:
+                logger.info(f"Namespace '{ns}' has {vector_count} vectors indexed")
+                return True
+            if delay is not None:
+                await asyncio.sleep(delay)
+
+        logger.warning(
+            f"Namespace '{ns}' reported {vector_count}/{expected_count} vectors after polling"
+        )
+        return False
+
     async def format_search_results(self, matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Format raw query matches into a more usable structure.
         
@@ -0,0 +1,16 @@
+"""Supabase client shared by the test scripts in this folder."""
+
+from functools import lru_cache
+
+from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
+
+
+@lru_cache(maxsize=4)
+def get_supabase(url: str, key: str) -> Client:
+    """Return one Supabase client per (url, key) for the whole process"""
+    return create_client(
+        url,
+        key,
+        options=ClientOptions(postgrest_client_timeout=10, storage_client_timeout=10),
+    )
@@ -0,0 +1,46 @@
+"""Shared objects for the integration test scripts.
+
+Callers are expected to have put the backend directory on sys.path already,
+as every script in this folder does before importing app modules.
+"""
+
+import io
+import threading
+
+_storage_singleton = None
+
+def get_storage():
+    """Return a StorageService shared by every test in this process"""
+    global _storage_singleton
+    if _storage_singleton is None:
+        from app.services.storage_service import StorageService
+        _storage_singleton = StorageService()
+    return _storage_singleton
+
+class _ThreadOutput(threading.local):
+    """Per-thread output buffer used while tests run concurrently"""
+    buffer = None
+
+_thread_output = _ThreadOutput()
+
+class ThreadRoutedStdout:
+    """Route writes to the calling thread's buffer, or to the real stream if it has none"""
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        return (_thread_output.buffer or self._stream).write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+def run_buffered(test_func):
+    """Run a test with its stdout captured, returning (result, output)"""
+    _thread_output.buffer = io.StringIO()
+    try:
+        return test_func(), _thread_output.buffer.getvalue()
+    finally:
+        _thread_output.buffer = None
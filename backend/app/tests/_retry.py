@@ -0,0 +1,48 @@
+"""Retry helper for the Supabase calls made by the test scripts in this folder."""
+
+import httpx
+import requests
+from tenacity import (
+    retry as _tenacity_retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+RETRY_STATUSES = frozenset({429, 503, 520})
+
+
+def _status_of(exc):
+    """Best-effort HTTP status of an exception raised by supabase-py or requests"""
+    for source in (exc, getattr(exc, "response", None)):
+        for attr in ("status_code", "status", "code"):
+            value = getattr(source, attr, None)
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+def _is_retryable(exc):
+    if isinstance(exc, (httpx.TransportError, requests.ConnectionError, requests.Timeout)):
+        return True
+    return _status_of(exc) in RETRY_STATUSES
+
+
+_retrying = _tenacity_retry(
+    stop=stop_after_attempt(4),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    retry=retry_if_exception(_is_retryable),
+    reraise=True,
+)
+
+
+def retry(fn):
+    """Call fn(), retrying transient failures with jittered exponential backoff.
+
+    Only network errors and 429/503/520 responses are retried; anything else,
+    or the last failed attempt, is re-raised to the caller. Only pass calls
+    that are safe to repeat: a retried write may already have been applied.
+    """
+    return _retrying(fn)()
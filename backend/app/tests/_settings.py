@@ -0,0 +1,38 @@
+"""Environment settings shared by the test scripts in this folder.
+
+`.env` is parsed once per process and the values are frozen, so scripts read
+attributes instead of calling os.getenv at every use.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import load_dotenv
+
+
+@dataclass(frozen=True)
+class Settings:
+    supabase_url: Optional[str]
+    supabase_service_role_key: Optional[str]
+    supabase_anon_key: Optional[str]
+    openai_api_key: Optional[str]
+    pinecone_api_key: Optional[str]
+    pinecone_environment: str
+    pinecone_index_name: str
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load .env once and return the frozen settings for this process"""
+    load_dotenv()
+    return Settings(
+        supabase_url=(os.getenv("SUPABASE_URL") or "").rstrip("/") or None,
+        supabase_service_role_key=os.getenv("SUPABASE_SERVICE_ROLE_KEY"),
+        supabase_anon_key=os.getenv("SUPABASE_ANON_KEY"),
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        pinecone_api_key=os.getenv("PINECONE_API_KEY"),
+        pinecone_environment=os.getenv("PINECONE_ENVIRONMENT", "aped-4627-b74a"),
+        pinecone_index_name=os.getenv("PINECONE_INDEX_NAME", "proj"),
+    )
@@ -0,0 +1,62 @@
+"""Setup shared by the Supabase explorer and setup scripts in this folder."""
+
+import logging
+import os
+import sys
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from _client import get_supabase
+from _settings import get_settings
+
+# Status lines stay on stdout; response payloads are only serialized at DEBUG
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
+# Add the backend directory to the path for app imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+_supabase_key = get_settings().supabase_service_role_key or ""
+
+# Auth headers for the service role key, built once at import
+SERVICE_HEADERS = {
+    "apikey": _supabase_key,
+    "Authorization": f"Bearer {_supabase_key}",
+}
+
+# One keep-alive session for every REST probe so the TLS handshake is paid once
+SESSION = requests.Session()
+SESSION.headers.update(SERVICE_HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 503, 520]),
+))
+
+# (connect, read) seconds, so a hung connection can't stall the run
+REQUEST_TIMEOUT = (3.05, 10)
+
+
+def print_header(text):
+    """Print a styled header for test sections"""
+    print("\n" + "=" * 50)
+    print(f" {text} ".center(50, "="))
+    print("=" * 50)
+
+
+def get_service_client():
+    """Return the shared Supabase client for the service role key"""
+    s = get_settings()
+    return get_supabase(s.supabase_url, s.supabase_service_role_key)
+
+
+def rows(response):
+    """Rows of a PostgREST response, or an empty list if it carried none"""
+    return getattr(response, "data", None) or []
+
+
+def dumps(obj):
+    """Serialize a response payload for display"""
+    return orjson.dumps(obj).decode()
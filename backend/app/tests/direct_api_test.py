@@ -1,5 +1,5 @@
 import os
-import requests
+import httpx
 import json
 from dotenv import load_dotenv
 
@@ -31,13 +31,19 @@ def test_direct_api():
         "Content-Type": "application/json"
     }
     
+    # One HTTP/2 client multiplexes every request below over a single connection
+    client = httpx.Client(http2=True, headers=headers, base_url=rest_url, timeout=10.0)
+    try:
+        _run_api_checks(client)
+    finally:
+        client.close()
+
+def _run_api_checks(client):
+    """Run the OPTIONS/GET/POST/DELETE checks against the REST API"""
     # 1. First, try to discover available tables
     print("\n==== Checking API capabilities ====")
     try:
-        options_response = requests.options(
-            f"{rest_url}/",
-            headers=headers
-        )
+        options_response = client.options("/")
         print(f"OPTIONS Status: {options_response.status_code}")
         print(f"Available headers: {options_response.headers}")
     except Exception as e:
@@ -46,10 +52,7 @@ def test_direct_api():
     # 2. Try to discover projects table specifically
     print("\n==== Checking projects table ====")
     try:
-        options_response = requests.options(
-            f"{rest_url}/projects",
-            headers=headers
-        )
+        options_response = client.options("/projects")
         print(f"OPTIONS projects Status: {options_response.status_code}")
         if options_response.status_code == 200:
             print(f"Definition headers: {options_response.headers}")
@@ -59,10 +62,7 @@ def test_direct_api():
     # 3. Try to list projects (GET)
     print("\n==== Listing projects (GET) ====")
     try:
-        get_response = requests.get(
-            f"{rest_url}/projects",
-            headers=headers
-        )
+        get_response = client.get("/projects")
         print(f"GET Status: {get_response.status_code}")
         if get_response.status_code == 200:
             projects = get_response.json()
@@ -81,11 +81,7 @@ def test_direct_api():
     }
     
     try:
-        post_response = requests.post(
-            f"{rest_url}/projects",
-            headers=headers,
-            json=test_project
-        )
+        post_response = client.post("/projects", json=test_project)
         print(f"POST Status: {post_response.status_code}")
         
         if post_response.status_code in (200, 201):
@@ -94,10 +90,7 @@ def test_direct_api():
             
             # Clean up by deleting the test project
             project_id = created_project[0]["id"]
-            delete_response = requests.delete(
-                f"{rest_url}/projects?id=eq.{project_id}",
-                headers=headers
-            )
+            delete_response = client.delete(f"/projects?id=eq.{project_id}")
             print(f"DELETE Status: {delete_response.status_code}")
             if delete_response.status_code == 200:
                 print("✅ Test project deleted successfully")
@@ -112,10 +105,9 @@ def test_direct_api():
     print("\n==== Viewing table definitions ====")
     try:
         # Directly query information_schema
-        headers["Accept"] = "application/json"
-        columns_response = requests.get(
-            f"{rest_url}/information_schema/columns?select=table_schema,table_name,column_name,data_type&table_name=eq.projects",
-            headers=headers
+        columns_response = client.get(
+            "/information_schema/columns?select=table_schema,table_name,column_name,data_type&table_name=eq.projects",
+            headers={"Accept": "application/json"}
         )
         print(f"Information Schema Status: {columns_response.status_code}")
         if columns_response.status_code == 200:
@@ -1,5 +1,5 @@
 import os
-import requests
+import httpx
 import json
 import uuid
 from dotenv import load_dotenv
@@ -39,14 +39,12 @@ def test_direct_api():
         "name": f"Test Project via Direct API {uuid.uuid4()}"
     }
     
+    # One HTTP/2 client multiplexes every phase of the test over a single connection
+    client = httpx.Client(http2=True, headers=headers, base_url=rest_url, timeout=10.0)
     try:
         # POST request to create record
         print(f"Creating project with data: {test_project}")
-        post_response = requests.post(
-            f"{rest_url}/projects",
-            headers=headers,
-            json=test_project
-        )
+        post_response = client.post("/projects", json=test_project)
         print(f"POST Status: {post_response.status_code}")
         
         if post_response.status_code in (200, 201):
@@ -58,10 +56,7 @@ def test_direct_api():
             
             # Test querying the record
             print("\n==== Querying the created project (GET) ====")
-            get_response = requests.get(
-                f"{rest_url}/projects?id=eq.{project_id}",
-                headers=headers
-            )
+            get_response = client.get(f"/projects?id=eq.{project_id}")
             print(f"GET Status: {get_response.status_code}")
             
             if get_response.status_code == 200:
@@ -70,10 +65,7 @@ def test_direct_api():
                 
                 # Clean up by deleting the test project
                 print("\n==== Deleting the test project (DELETE) ====")
-                delete_response = requests.delete(
-                    f"{rest_url}/projects?id=eq.{project_id}",
-                    headers=headers
-                )
+                delete_response = client.delete(f"/projects?id=eq.{project_id}")
                 print(f"DELETE Status: {delete_response.status_code}")
                 
                 if delete_response.status_code == 200:
@@ -89,10 +81,7 @@ def test_direct_api():
             
             # Try to get column information to debug
             print("\n==== Getting column information ====")
-            options_response = requests.options(
-                f"{rest_url}/projects",
-                headers=headers
-            )
+            options_response = client.options("/projects")
             print(f"OPTIONS Status: {options_response.status_code}")
             if options_response.status_code == 200:
                 print(f"Definition headers: {options_response.headers}")
@@ -102,6 +91,8 @@ def test_direct_api():
             
     except Exception as e:
         print(f"❌ Error during test: {str(e)}")
+    finally:
+        client.close()
     
     print("\n==== Supabase Database Test FAILED ====")
     return False
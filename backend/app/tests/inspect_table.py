@@ -1,7 +1,7 @@
 import os
 import sys
 import json
-import requests
+import httpx
 from dotenv import load_dotenv
 from supabase import create_client
 
@@ -36,36 +36,33 @@ def inspect_projects_table():
         "Prefer": "return=representation"
     }
     
-    # Try to get the schema information directly via REST API
-    print("\nFetching OpenAPI specification to list available tables...")
-    response = requests.get(f"{supabase_url}/rest/v1/", headers=headers)
-    print(f"Status: {response.status_code}")
-    
-    # Try a simpler test record without the description field
-    print("\nTesting minimal record insertion...")
-    test_data = {
-        "name": "Test Project Minimal"
-    }
-    
-    # Try POST request directly
-    response = requests.post(
-        f"{supabase_url}/rest/v1/projects",
-        headers=headers,
-        json=test_data
-    )
-    
-    print(f"Status: {response.status_code}")
-    print(f"Response: {response.text}")
-    
-    if response.status_code >= 400:
-        print("\nFetching table information via REST API...")
-        # Try using the OPTIONS method to get table information
-        options_response = requests.options(
-            f"{supabase_url}/rest/v1/projects",
-            headers=headers
-        )
-        print(f"OPTIONS Status: {options_response.status_code}")
-        print(f"OPTIONS Headers: {options_response.headers}")
+    # One HTTP/2 client multiplexes the REST probes over a single connection
+    with httpx.Client(
+        http2=True, headers=headers, base_url=f"{supabase_url}/rest/v1", timeout=10.0
+    ) as client:
+        # Try to get the schema information directly via REST API
+        print("\nFetching OpenAPI specification to list available tables...")
+        response = client.get("/")
+        print(f"Status: {response.status_code}")
+        
+        # Try a simpler test record without the description field
+        print("\nTesting minimal record insertion...")
+        test_data = {
+            "name": "Test Project Minimal"
+        }
+        
+        # Try POST request directly
+        response = client.post("/projects", json=test_data)
+        
+        print(f"Status: {response.status_code}")
+        print(f"Response: {response.text}")
+        
+        if response.status_code >= 400:
+            print("\nFetching table information via REST API...")
+            # Try using the OPTIONS method to get table information
+            options_response = client.options("/projects")
+            print(f"OPTIONS Status: {options_response.status_code}")
+            print(f"OPTIONS Headers: {options_response.headers}")
 
     # Try direct SQL query to inspect table structure
     print("\nExecuting SQL query to inspect table columns...")
@@ -1,12 +1,29 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from supabase import create_client
 
 # Load environment variables
 load_dotenv()
 
+# Whether the execute_sql RPC exists; None until the first probe
+_RPC_AVAILABLE = None
+
+# Schemas and tables in one statement so the RPC path is a single round-trip
+_CATALOG_QUERY = """
+    SELECT 'schema' AS kind, schema_name AS table_schema, NULL AS table_name
+    FROM information_schema.schemata
+    UNION ALL
+    SELECT 'table', table_schema, table_name
+    FROM information_schema.tables
+    WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
+    ORDER BY kind, table_schema, table_name;
+"""
+
 def list_tables_and_schemas():
     """List all tables and schemas available in the Supabase database"""
+    global _RPC_AVAILABLE
+
     # Get credentials
     supabase_url = os.getenv("SUPABASE_URL")
     supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
@@ -15,68 +32,60 @@ def list_tables_and_schemas():
     supabase = create_client(supabase_url, supabase_key)
     print("✅ Connected to Supabase")
     
-    # Using the rpc function to execute a SQL query
+    # Using the rpc function to execute a SQL query, unless a previous probe showed it is missing
+    rows = None
+    if _RPC_AVAILABLE is not False:
+        try:
+            response = supabase.rpc("execute_sql", {"query": _CATALOG_QUERY}).execute()
+            _RPC_AVAILABLE = True
+            rows = response.data if hasattr(response, 'data') else None
+        except Exception as e:
+            print(f"execute_sql RPC not available: {str(e)}")
+            _RPC_AVAILABLE = False
+    
+    if rows:
+        print("\n==== Listing Database Schemas ====")
+        schemas = [row['table_schema'] for row in rows if row['kind'] == 'schema']
+        print(f"Available schemas: {schemas}")
+        
+        print("\n==== Listing Tables in Each Schema ====")
+        print("Tables by schema:")
+        for row in rows:
+            if row['kind'] == 'table':
+                print(f"  {row['table_schema']}.{row['table_name']}")
+        return
+    
+    # Fallback to direct REST queries if RPC not available
     print("\n==== Listing Database Schemas ====")
     try:
-        response = supabase.rpc(
-            "execute_sql",
-            {"query": "SELECT schema_name FROM information_schema.schemata ORDER BY schema_name;"}
-        ).execute()
-        
+        print("Trying direct query for schemas...")
+        response = supabase.table("information_schema.schemata").select("schema_name").execute()
         if hasattr(response, 'data') and response.data:
-            print(f"Available schemas: {response.data}")
+            print(f"Available schemas via direct query: {response.data}")
         else:
-            print(f"❌ Failed to get schemas: {response}")
+            print(f"❌ Failed to get schemas via direct query: {response}")
     except Exception as e:
-        print(f"Error querying schemas: {str(e)}")
-        # Fallback to direct query if RPC not available
-        try:
-            print("Trying direct query for schemas...")
-            response = supabase.table("information_schema.schemata").select("schema_name").execute()
-            if hasattr(response, 'data') and response.data:
-                print(f"Available schemas via direct query: {response.data}")
-            else:
-                print(f"❌ Failed to get schemas via direct query: {response}")
-        except Exception as e2:
-            print(f"Error with direct schema query: {str(e2)}")
+        print(f"Error with direct schema query: {str(e)}")
     
     print("\n==== Listing Tables in Each Schema ====")
-    try:
-        response = supabase.rpc(
-            "execute_sql",
-            {"query": """
-                SELECT 
-                    table_schema, 
-                    table_name 
-                FROM 
-                    information_schema.tables 
-                WHERE 
-                    table_schema NOT IN ('pg_catalog', 'information_schema') 
-                ORDER BY 
-                    table_schema, table_name;
-            """}
-        ).execute()
-        
-        if hasattr(response, 'data') and response.data:
-            print("Tables by schema:")
-            for row in response.data:
-                print(f"  {row['table_schema']}.{row['table_name']}")
-        else:
-            print(f"❌ Failed to get tables: {response}")
-    except Exception as e:
-        print(f"Error querying tables: {str(e)}")
-        # Try another approach
+    print("Trying REST API to list tables...")
+
+    def probe(schema):
         try:
-            print("Trying REST API to list tables...")
-            for schema in ['public', 'api', 'auth', 'storage']:
-                try:
-                    print(f"\nTesting access to schema: {schema}")
-                    response = supabase.from_(f"{schema}.dummy_test").select("*").limit(1).execute()
-                    print(f"  Access to {schema} schema: Success")
-                except Exception as schema_e:
-                    print(f"  Access to {schema} schema: Failed - {str(schema_e)}")
-        except Exception as e2:
-            print(f"Error with REST API approach: {str(e2)}")
+            supabase.from_(f"{schema}.dummy_test").select("*").limit(1).execute()
+            return schema, None
+        except Exception as schema_e:
+            return schema, schema_e
+
+    # The probes are independent, so issue them concurrently and report in order
+    schemas = ['public', 'api', 'auth', 'storage']
+    with ThreadPoolExecutor(max_workers=len(schemas)) as executor:
+        for schema, error in executor.map(probe, schemas):
+            print(f"\nTesting access to schema: {schema}")
+            if error is None:
+                print(f"  Access to {schema} schema: Success")
+            else:
+                print(f"  Access to {schema} schema: Failed - {str(error)}")
 
 if __name__ == "__main__":
-    list_tables_and_schemas() 
\ No newline at end of file
+    list_tables_and_schemas()
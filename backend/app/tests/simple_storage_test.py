@@ -20,7 +20,7 @@ try:
     
     # Try importing the module
     print("Importing storage service...")
-    from app.services.storage_service import StorageService, StorageProvider
+    from _fixtures import get_storage
     print("Successfully imported storage service")
     
     def test_storage():
@@ -29,7 +29,7 @@ try:
         
         try:
             # Create a storage service
-            storage = StorageService()
+            storage = get_storage()
             print(f"Storage service initialized with provider: {storage.storage.__class__.__name__}")
             
             # Create a test file
@@ -1,31 +1,52 @@
-import os
-import sys
-import json
-import requests
-from dotenv import load_dotenv
-from supabase import create_client, Client
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from _settings import get_settings
+from _supabase_common import print_header, get_service_client, dumps, REQUEST_TIMEOUT, SERVICE_HEADERS, SESSION
+from _client import get_supabase
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# Add the parent directory to the path for imports
-parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
-sys.path.append(parent_dir)
+_LIST_TABLES_SQL = """
+SELECT table_schema, table_name 
+FROM information_schema.tables 
+WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
+ORDER BY table_schema, table_name;
+"""
 
-def print_header(text):
-    """Print a styled header for test sections"""
-    print("\n" + "=" * 50)
-    print(f" {text} ".center(50, "="))
-    print("=" * 50)
+_PROJECTS_CATALOG_SQL = (
+    "SELECT table_schema, table_name FROM information_schema.tables "
+    "WHERE table_name IN ('projects')"
+)
+
+# Only the first few rows are ever shown, so ask PostgREST for just those
+_PAGE_HEADERS = {"Range-Unit": "items", "Range": "0-9"}
+_REPRESENTATION_HEADERS = {"Prefer": "return=representation"}
+_MINIMAL_SERVICE_HEADERS = {**SERVICE_HEADERS, "Prefer": "return=minimal"}
+
+_TEST_PROJECT = {
+    "name": "Test Project",
+    "description": "Created by database explorer"
+}
+
+def _projects_target(schema):
+    """Insert target for the projects table in one schema"""
+    if schema == "public":
+        return "projects"
+    return {
+        "path": "projects",
+        "headers": {**_MINIMAL_SERVICE_HEADERS, "Content-Profile": schema},
+        "label": f"{schema}.projects",
+    }
 
 def explore_supabase_db():
     """Explore the Supabase database structure and connection options"""
     print_header("SUPABASE DATABASE EXPLORER")
     
     # Get credentials
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    supabase_anon_key = os.getenv("SUPABASE_ANON_KEY")
+    s = get_settings()
+    supabase_url = s.supabase_url
+    supabase_key = s.supabase_service_role_key
+    supabase_anon_key = s.supabase_anon_key
     
     if not supabase_url or not supabase_key:
         print("❌ Supabase credentials not found in environment variables")
@@ -37,23 +58,41 @@ def explore_supabase_db():
         print(f"Anon Key: {supabase_anon_key[:5]}...{supabase_anon_key[-5:]}")
     
     # Create clients with different keys to test
-    supabase_service = create_client(supabase_url, supabase_key)
+    supabase_service = get_service_client()
     print("✅ Successfully created Supabase client with service role key")
     
     if supabase_anon_key:
-        supabase_anon = create_client(supabase_url, supabase_anon_key)
+        supabase_anon = get_supabase(supabase_url, supabase_anon_key)
         print("✅ Successfully created Supabase client with anon key")
     
+    # The read-only REST probes below don't depend on each other, so start them all
+    # now and only wait on each one where its section prints the result
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        structure_future = executor.submit(
+            SESSION.get, f"{supabase_url}/rest/v1/", timeout=REQUEST_TIMEOUT
+        )
+        projects_future = executor.submit(
+            SESSION.get, f"{supabase_url}/rest/v1/projects", headers=_PAGE_HEADERS,
+            timeout=REQUEST_TIMEOUT
+        )
+        api_projects_future = executor.submit(
+            SESSION.get, f"{supabase_url}/rest/v1/api/projects", headers=_PAGE_HEADERS,
+            timeout=REQUEST_TIMEOUT
+        )
+        _explore(supabase_url, supabase_service,
+                 structure_future, projects_future, api_projects_future)
+    
+    print_header("EXPLORATION COMPLETE")
+
+def _explore(supabase_url, supabase_service,
+             structure_future, projects_future, api_projects_future):
+    """Print each exploration section, consuming the prefetched REST probes"""
     # Try direct HTTP API call to gather info about available tables
     try:
         print_header("EXPLORING DATABASE STRUCTURE")
-        headers = {
-            "apikey": supabase_key,
-            "Authorization": f"Bearer {supabase_key}"
-        }
         
         # Use the Supabase REST API to list tables
-        response = requests.get(f"{supabase_url}/rest/v1/", headers=headers)
+        response = structure_future.result()
         print(f"Database structure response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -63,33 +102,24 @@ def explore_supabase_db():
             
         # Try to get information schema
         print("\nQuerying information_schema.tables to list all tables:")
-        sql_query = """
-        SELECT table_schema, table_name 
-        FROM information_schema.tables 
-        WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
-        ORDER BY table_schema, table_name;
-        """
-        
         try:
             # Try using the supabase-py client
-            response = supabase_service.rpc('exec_sql', {"query": sql_query}).execute()
-            print(f"Response: {json.dumps(response.data) if hasattr(response, 'data') else 'No data'}")
+            response = supabase_service.rpc('exec_sql', {"query": _LIST_TABLES_SQL}).execute()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response: %s", dumps(response.data) if hasattr(response, 'data') else 'No data')
         except Exception as e:
             print(f"Error with supabase-py client: {str(e)}")
             
             # Try direct REST API call
             print("\nTrying direct REST API call:")
-            headers = {
-                "apikey": supabase_key,
-                "Authorization": f"Bearer {supabase_key}",
-                "Content-Type": "application/json",
-                "Prefer": "return=representation"
-            }
-            
-            payload = {"query": sql_query}
-            response = requests.post(f"{supabase_url}/rest/v1/rpc/exec_sql", json=payload, headers=headers)
+            response = SESSION.post(
+                f"{supabase_url}/rest/v1/rpc/exec_sql",
+                json={"query": _LIST_TABLES_SQL},
+                headers=_REPRESENTATION_HEADERS,
+                timeout=REQUEST_TIMEOUT
+            )
             print(f"Status: {response.status_code}")
-            print(f"Response: {response.text}")
+            logger.debug("Response: %s", response.text)
     
     except Exception as e:
         print(f"❌ Error exploring database structure: {str(e)}")
@@ -97,11 +127,6 @@ def explore_supabase_db():
     # Try different schema names for insert
     try:
         print_header("TESTING TABLE INSERTIONS WITH DIFFERENT PREFIXES")
-        test_data = {
-            "name": "Test Project",
-            "description": "Created by database explorer"
-        }
-        
         # Try various combinations
         table_paths_to_try = [
             "projects",  # no schema prefix
@@ -110,29 +135,58 @@ def explore_supabase_db():
             "auth.projects",
             "storage.projects",
             # Try the table without schema but with auth headers
-            {"path": "projects", "headers": {"apikey": supabase_key, "Authorization": f"Bearer {supabase_key}"}}
+            {"path": "projects", "headers": _MINIMAL_SERVICE_HEADERS}
         ]
         
-        for table_path in table_paths_to_try:
+        # One catalog query says which schemas really hold a projects table, so
+        # only confirmed targets get a test row instead of every candidate.
+        # PostgREST picks the schema from the Content-Profile header, not from a
+        # "schema.table" path, so non-public schemas are addressed that way.
+        try:
+            catalog = supabase_service.rpc('exec_sql', {"query": _PROJECTS_CATALOG_SQL}).execute()
+            schemas = {row["table_schema"] for row in (catalog.data or [])}
+        except Exception as e:
+            print(f"Catalog lookup failed, trying every path: {str(e)}")
+        else:
+            if schemas:
+                print(f"Schemas with a projects table: {', '.join(sorted(schemas))}")
+                table_paths_to_try = [_projects_target(schema) for schema in sorted(schemas)]
+            else:
+                # exec_sql may be defined to return void, leaving no rows to go by
+                print("Catalog lookup returned no rows, trying every path")
+        
+        def _try_path(table_path):
+            """Attempt one insert variant; returns (table_path, status, text_or_exc)"""
             try:
                 if isinstance(table_path, dict):
-                    path = table_path["path"]
-                    print(f"\nTrying direct API call to '{path}' with auth headers:")
-                    
-                    response = requests.post(
-                        f"{supabase_url}/rest/v1/{path}", 
-                        json=test_data,
-                        headers=table_path["headers"]
+                    response = SESSION.post(
+                        f"{supabase_url}/rest/v1/{table_path['path']}", 
+                        json=_TEST_PROJECT,
+                        headers=table_path["headers"],
+                        timeout=REQUEST_TIMEOUT
                     )
-                    
-                    print(f"Status: {response.status_code}")
-                    print(f"Response: {response.text}")
-                else:
-                    print(f"\nTrying path: '{table_path}'")
-                    response = supabase_service.from_(table_path).insert(test_data).execute()
-                    print(f"Success with '{table_path}': {json.dumps(response.data)}")
+                    return table_path, response.status_code, response.text
+                response = supabase_service.from_(table_path).insert(_TEST_PROJECT).execute()
+                return table_path, "ok", response.data
             except Exception as e:
-                print(f"Error with '{table_path}': {str(e)}")
+                return table_path, "error", e
+        
+        # Each variant is an independent round trip, so try them all at once
+        with ThreadPoolExecutor(max_workers=8) as path_executor:
+            futures = [path_executor.submit(_try_path, tp) for tp in table_paths_to_try]
+            for future in as_completed(futures):
+                table_path, status, result = future.result()
+                if status == "error":
+                    print(f"\nError with '{table_path}': {str(result)}")
+                elif isinstance(table_path, dict):
+                    label = table_path.get("label", table_path["path"])
+                    print(f"\nDirect API call to '{label}' with auth headers:")
+                    print(f"Status: {status}")
+                    logger.debug("Response: %s", result)
+                else:
+                    print(f"\nSuccess with '{table_path}'")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Inserted: %s", dumps(result))
     
     except Exception as e:
         print(f"❌ Error testing table insertions: {str(e)}")
@@ -141,30 +195,20 @@ def explore_supabase_db():
     try:
         print_header("TESTING DIRECT REST API ACCESS")
         
-        # Request headers
-        headers = {
-            "apikey": supabase_key,
-            "Authorization": f"Bearer {supabase_key}",
-            "Content-Type": "application/json",
-            "Prefer": "return=representation"
-        }
-        
         # Try to get data from projects table
         print("\nGET request to projects:")
-        response = requests.get(f"{supabase_url}/rest/v1/projects", headers=headers)
+        response = projects_future.result()
         print(f"Status: {response.status_code}")
-        print(f"Response: {response.text[:1000]}")  # Limit output length
+        logger.debug("Response: %s", response.text)
         
         # Try with api prefix
         print("\nGET request to api/projects:")
-        response = requests.get(f"{supabase_url}/rest/v1/api/projects", headers=headers)
+        response = api_projects_future.result()
         print(f"Status: {response.status_code}")
-        print(f"Response: {response.text[:1000]}")  # Limit output length
+        logger.debug("Response: %s", response.text)
         
     except Exception as e:
         print(f"❌ Error with direct REST API access: {str(e)}")
-    
-    print_header("EXPLORATION COMPLETE")
 
 if __name__ == "__main__":
     explore_supabase_db() 
\ No newline at end of file
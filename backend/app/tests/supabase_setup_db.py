@@ -1,30 +1,46 @@
-import os
-import sys
-import json
-import requests
-from dotenv import load_dotenv
-from supabase import create_client, Client
+import httpx
+from postgrest.exceptions import APIError
+from _settings import get_settings
+from _supabase_common import print_header, get_service_client, REQUEST_TIMEOUT, SESSION
 
-# Load environment variables
-load_dotenv()
+# Creates the projects table in the api schema
+_CREATE_TABLE_SQL = """
+-- Create projects table in the api schema
+CREATE TABLE IF NOT EXISTS api.projects (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name TEXT NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    user_id UUID,
+    is_public BOOLEAN DEFAULT false
+);
 
-# Add the parent directory to the path for imports
-parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
-sys.path.append(parent_dir)
+-- Add comments to the table
+COMMENT ON TABLE api.projects IS 'User projects for document storage and analysis';
 
-def print_header(text):
-    """Print a styled header for test sections"""
-    print("\n" + "=" * 50)
-    print(f" {text} ".center(50, "="))
-    print("=" * 50)
+-- Grant permissions (since we're in api schema)
+GRANT ALL ON api.projects TO postgres, service_role;
+GRANT SELECT, INSERT, UPDATE ON api.projects TO authenticated;
+"""
+
+# Auth headers live on SESSION; only the per-request preference goes here
+_REPRESENTATION_HEADERS = {"Prefer": "return=representation"}
+
+_TEST_PROJECT = {
+    "name": "Test Project",
+    "description": "Created by setup script",
+    "is_public": True
+}
 
 def setup_supabase_db():
     """Set up the necessary database structure in Supabase"""
     print_header("SUPABASE DATABASE SETUP")
     
     # Get credentials
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    s = get_settings()
+    supabase_url = s.supabase_url
+    supabase_key = s.supabase_service_role_key
     
     if not supabase_url or not supabase_key:
         print("❌ Supabase credentials not found in environment variables")
@@ -32,14 +48,6 @@ def setup_supabase_db():
     
     print(f"Connecting to Supabase at {supabase_url}")
     
-    # Create direct API headers
-    headers = {
-        "apikey": supabase_key,
-        "Authorization": f"Bearer {supabase_key}",
-        "Content-Type": "application/json",
-        "Prefer": "return=representation"
-    }
-    
     # Try to create the projects table in the api schema
     try:
         print_header("SETTING UP DATABASE TABLES")
@@ -47,66 +55,30 @@ def setup_supabase_db():
         # First, check if we can access the SQL API to confirm our permissions
         print("Testing SQL access...")
         
-        # Use direct SQL to create the projects table in the api schema
-        create_table_sql = """
-        -- Create projects table in the api schema
-        CREATE TABLE IF NOT EXISTS api.projects (
-            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-            name TEXT NOT NULL,
-            description TEXT,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
-            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
-            user_id UUID,
-            is_public BOOLEAN DEFAULT false
-        );
-        
-        -- Add comments to the table
-        COMMENT ON TABLE api.projects IS 'User projects for document storage and analysis';
-        
-        -- Grant permissions (since we're in api schema)
-        GRANT ALL ON api.projects TO postgres, service_role;
-        GRANT SELECT, INSERT, UPDATE ON api.projects TO authenticated;
-        """
-        
-        # Try using direct connection through REST API
-        print("\nAttempting to create projects table via SQL...")
-        
-        # Set up REST API endpoints for Supabase SQL API
-        sql_url = f"{supabase_url}/rest/v1/pg_dump"  # Custom endpoint for raw SQL
-        
-        # Try to direct SQL execution via the SQL API
-        response = requests.post(
-            sql_url,
-            headers=headers,
-            json={"query": create_table_sql}
-        )
-        
-        print(f"SQL API Response Status: {response.status_code}")
-        print(f"Response: {response.text if response.text else 'No response body'}")
-        
-        if response.status_code >= 400:
-            print("❌ Failed to execute SQL directly")
+        # Supabase has no raw-SQL REST endpoint; the exec_sql RPC is the only
+        # way to run DDL from here, and only if the project defines it
+        print("\nAttempting to create projects table via the exec_sql RPC...")
+        try:
+            get_service_client().rpc('exec_sql', {"query": _CREATE_TABLE_SQL}).execute()
+            print("✅ Executed table setup SQL")
+        except (APIError, httpx.HTTPError) as e:
+            print(f"❌ Failed to execute SQL directly: {str(e)}")
             
             # Try alternate approach with Supabase Dashboard SQL editor
             print("\nAlternative method:")
             print("Please run the following SQL in your Supabase Dashboard SQL Editor:")
             print("=" * 50)
-            print(create_table_sql)
+            print(_CREATE_TABLE_SQL)
             print("=" * 50)
             print("After running the SQL, re-run the integration tests.")
         
         # Try to create a test record in the projects table
         print("\nTesting table by creating a record...")
-        test_data = {
-            "name": "Test Project",
-            "description": "Created by setup script",
-            "is_public": True
-        }
-        
-        response = requests.post(
+        response = SESSION.post(
             f"{supabase_url}/rest/v1/projects",
-            headers=headers,
-            json=test_data
+            headers=_REPRESENTATION_HEADERS,
+            json=_TEST_PROJECT,
+            timeout=REQUEST_TIMEOUT
         )
         
         print(f"Insert Status: {response.status_code}")
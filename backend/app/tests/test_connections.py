@@ -1,10 +1,16 @@
 import os
 import sys
 import json
-from dotenv import load_dotenv
-from supabase import create_client, Client
+from _settings import get_settings
+from _client import get_supabase
+from _retry import retry
+from _supabase_common import rows, REQUEST_TIMEOUT
+from _fixtures import run_buffered, ThreadRoutedStdout
 import pinecone
 import uuid
+import hashlib
+import requests
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path to import modules
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,16 +18,17 @@ app_dir = os.path.dirname(current_dir)
 backend_dir = os.path.dirname(app_dir)
 sys.path.insert(0, backend_dir)
 
-# Load environment variables
-load_dotenv()
+# Module attributes a usable Pinecone client is expected to expose
+ESSENTIAL_PINECONE_ATTRS = frozenset({'Index', 'create_index', 'list_indexes', 'delete_index'})
 
 def test_supabase_connection():
     """Test Supabase connection and basic operations"""
     print("\n=== Testing Supabase Connection ===")
     
     # Get credentials from environment variables
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    s = get_settings()
+    supabase_url = s.supabase_url
+    supabase_key = s.supabase_service_role_key
     
     if not supabase_url or not supabase_key:
         print("❌ Supabase credentials not found in environment variables")
@@ -30,15 +37,15 @@ def test_supabase_connection():
     print(f"Connecting to Supabase at {supabase_url}")
     try:
         # Initialize Supabase client
-        supabase = create_client(supabase_url, supabase_key)
+        supabase = get_supabase(supabase_url, supabase_key)
         print("✅ Supabase client created successfully")
         
         # Test a simpler approach - just check if we can access Supabase
         try:
             # Check what schemas are available
             print("Checking schema access...")
-            schemas_response = supabase.rpc('get_schemas').execute()
-            print(f"Available schemas: {schemas_response.data if hasattr(schemas_response, 'data') else 'Unknown response format'}")
+            schemas_response = retry(supabase.rpc('get_schemas').execute)
+            print(f"Available schemas: {rows(schemas_response)}")
             print("✅ Successfully accessed Supabase RPC")
             return True
         except Exception as schema_e:
@@ -47,8 +54,8 @@ def test_supabase_connection():
             # Try a very basic table access
             try:
                 print("Trying basic table access...")
-                response = supabase.from_("projects").select("*").limit(1).execute()
-                print(f"✅ Supabase query successful. Got {len(response.data) if hasattr(response, 'data') else 'unknown'} results")
+                response = retry(supabase.from_("projects").select("*").limit(1).execute)
+                print(f"✅ Supabase query successful. Got {len(rows(response))} results")
                 return True
             except Exception as e:
                 print(f"Basic table access failed: {str(e)}")
@@ -57,12 +64,11 @@ def test_supabase_connection():
                 try:
                     print("Testing REST API access...")
                     url = f"{supabase_url}/rest/v1/"
-                    import requests
                     headers = {
                         "apikey": supabase_key,
                         "Authorization": f"Bearer {supabase_key}"
                     }
-                    response = requests.get(url, headers=headers)
+                    response = retry(lambda: requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT))
                     if response.status_code == 200:
                         print(f"✅ Supabase REST API accessible. Status: {response.status_code}")
                         return True
@@ -83,9 +89,10 @@ def test_pinecone_connection():
     print("\n=== Testing Pinecone Connection ===")
     
     # Get credentials from environment variables
-    pinecone_api_key = os.getenv("PINECONE_API_KEY")
-    pinecone_environment = os.getenv("PINECONE_ENVIRONMENT")
-    pinecone_index_name = os.getenv("PINECONE_INDEX_NAME")
+    s = get_settings()
+    pinecone_api_key = s.pinecone_api_key
+    pinecone_environment = s.pinecone_environment
+    pinecone_index_name = s.pinecone_index_name
     
     if not pinecone_api_key:
         print("❌ Pinecone API key not found in environment variables")
@@ -99,6 +106,7 @@ def test_pinecone_connection():
         
         # Get attributes
         attributes = dir(pinecone)
+        attribute_set = frozenset(attributes)
         relevant_attrs = [attr for attr in attributes if not attr.startswith('__')]
         
         print(f"Pinecone module contains {len(relevant_attrs)} public attributes")
@@ -109,15 +117,14 @@ def test_pinecone_connection():
             print(f"Pinecone version: {pinecone.__version__}")
         
         # Try to find Index class
-        if 'Index' in attributes:
+        if 'Index' in attribute_set:
             print("✅ Found Index class in pinecone module")
         
         # See if module has expected attributes
-        essential_attrs = ['Index', 'create_index', 'list_indexes', 'delete_index']
-        found_attrs = [attr for attr in essential_attrs if attr in attributes]
+        found_attrs = ESSENTIAL_PINECONE_ATTRS & attribute_set
         
         if found_attrs:
-            print(f"✅ Found essential Pinecone attributes: {', '.join(found_attrs)}")
+            print(f"✅ Found essential Pinecone attributes: {', '.join(sorted(found_attrs))}")
             return True
         else:
             print("⚠️ No essential attributes found. May have limited functionality.")
@@ -132,8 +139,9 @@ def test_storage_connection():
     print("\n=== Testing Storage Connection (Supabase) ===")
     
     # Get credentials from environment variables
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    s = get_settings()
+    supabase_url = s.supabase_url
+    supabase_key = s.supabase_service_role_key
     
     if not supabase_url or not supabase_key:
         print("❌ Supabase credentials not found in environment variables")
@@ -141,21 +149,20 @@ def test_storage_connection():
     
     try:
         # Initialize Supabase client
-        supabase = create_client(supabase_url, supabase_key)
+        supabase = get_supabase(supabase_url, supabase_key)
         
         # Check if the documents bucket exists or create it
         print("Checking for 'documents' bucket...")
         try:
-            buckets = supabase.storage.list_buckets()
-            # Handle different return formats based on supabase-py version
-            if isinstance(buckets, list):
-                bucket_names = [bucket.get('name') for bucket in buckets if isinstance(bucket, dict)]
-            else:
-                # Newer versions might return a response object
-                bucket_data = getattr(buckets, 'data', [])
-                bucket_names = [bucket.get('name') for bucket in bucket_data if isinstance(bucket, dict)]
-            
-            bucket_exists = 'documents' in bucket_names
+            buckets = retry(supabase.storage.list_buckets)
+            # Handle different return formats based on supabase-py version: a list
+            # of dicts or bucket objects, or (newer versions) a response object
+            if not isinstance(buckets, list):
+                buckets = getattr(buckets, 'data', None) or []
+            bucket_exists = any(
+                (bucket.get('name') if isinstance(bucket, dict) else getattr(bucket, 'name', None)) == 'documents'
+                for bucket in buckets
+            )
             
             if bucket_exists:
                 print("✅ 'documents' bucket already exists")
@@ -178,27 +185,35 @@ def test_storage_connection():
             # Test uploading a small file
             print("Testing file upload...")
             test_content = b"This is a test file to verify storage functionality."
-            test_file_name = f"test_{uuid.uuid4()}.txt"
+            expected_digest = hashlib.blake2b(test_content).digest()
+            test_file_name = f"test_{uuid.uuid4().hex}.txt"
             
             try:
+                # Not retried: if a lost response hid a stored upload, a retry
+                # would fail with 409 Duplicate for the wrong reason
                 supabase.storage.from_('documents').upload(
                     path=test_file_name,
                     file=test_content,
                     file_options={"content-type": "text/plain"}
                 )
                 
-                # Test downloading the file
+                # Test downloading the file, streaming it through a signed URL
                 print("Testing file download...")
-                download_result = supabase.storage.from_('documents').download(test_file_name)
+                signed = retry(lambda: supabase.storage.from_('documents').create_signed_url(test_file_name, 60))
+                digest = hashlib.blake2b()
+                with requests.get(signed["signedURL"], stream=True, timeout=(3, 30)) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(65536):
+                        digest.update(chunk)
                 
-                if isinstance(download_result, bytes) and download_result == test_content:
+                if digest.digest() == expected_digest:
                     print("✅ Storage upload and download successful")
                 else:
                     print("❌ Downloaded content doesn't match or has unexpected format")
                 
                 # Cleanup
                 print("Cleaning up test file...")
-                supabase.storage.from_('documents').remove([test_file_name])
+                retry(lambda: supabase.storage.from_('documents').remove([test_file_name]))
                 print("✅ Test file removed")
                 
                 return True
@@ -216,9 +231,20 @@ def test_storage_connection():
 if __name__ == "__main__":
     print("Testing connections to external services...\n")
     
-    supabase_ok = test_supabase_connection()
-    pinecone_ok = test_pinecone_connection()
-    storage_ok = test_storage_connection()
+    # The three checks hit independent services, so run them concurrently and
+    # print each one's buffered output in the usual order afterwards
+    checks = [test_supabase_connection, test_pinecone_connection, test_storage_connection]
+    real_stdout = sys.stdout
+    sys.stdout = ThreadRoutedStdout(real_stdout)
+    try:
+        with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+            futures = [executor.submit(run_buffered, check) for check in checks]
+            outcomes = [future.result() for future in futures]
+    finally:
+        sys.stdout = real_stdout
+    for _, output in outcomes:
+        print(output, end="")
+    supabase_ok, pinecone_ok, storage_ok = (result for result, _ in outcomes)
     
     print("\n=== Connection Test Results ===")
     print(f"Supabase: {'✅ Connected' if supabase_ok else '❌ Failed'}")
@@ -3,19 +3,16 @@ import unittest
 import uuid
 import sys
 import traceback
-from dotenv import load_dotenv
+from _settings import get_settings
 # Add the parent directory to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from app.services.storage_service import StorageService, StorageProvider
 
-# Load environment variables
-load_dotenv()
-
 # Debug output
 print("Starting storage service test")
 print(f"Python version: {sys.version}")
 print(f"Current directory: {os.getcwd()}")
-print(f"Environment variables: SUPABASE_URL={os.getenv('SUPABASE_URL', 'Not set')}")
+print(f"Environment variables: SUPABASE_URL={get_settings().supabase_url or 'Not set'}")
 
 class TestStorageService(unittest.TestCase):
     """Test the storage service functionality"""
@@ -27,7 +24,7 @@ class TestStorageService(unittest.TestCase):
             # Initialize storage service with default provider (Supabase)
             self.storage_service = StorageService()
             # Generate a unique test file name
-            self.test_filename = f"test_file_{uuid.uuid4()}.txt"
+            self.test_filename = f"test_file_{uuid.uuid4().hex}.txt"
             # Create a test file content
             self.test_content = b"This is a test file for storage service"
             print(f"Test file created: {self.test_filename}")
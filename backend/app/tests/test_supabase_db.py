@@ -1,75 +1,83 @@
-import os
 import sys
 import uuid
-import json
+import logging
 import time
 import traceback
-from dotenv import load_dotenv
+from _settings import get_settings
+from _retry import retry
+from _supabase_common import dumps, print_header, rows
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-def print_header(text):
-    """Print a styled header for test sections"""
-    print("\n" + "=" * 50)
-    print(f" {text} ".center(50, "="))
-    print("=" * 50)
+# Rows written (and then removed) by the insert/query round trip
+TEST_ROW_COUNT = 3
 
 def test_supabase_db():
     """Test Supabase database functionality"""
     print_header("TESTING SUPABASE DATABASE")
     
     try:
-        from supabase import create_client
+        from _client import get_supabase
         
         # Get credentials
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+        s = get_settings()
+        supabase_url = s.supabase_url
+        supabase_key = s.supabase_service_role_key
         
         if not supabase_url or not supabase_key:
             print("❌ Supabase credentials not found in environment variables")
             return False
         
         print(f"Connecting to Supabase at {supabase_url}")
-        supabase = create_client(supabase_url, supabase_key)
+        supabase = get_supabase(supabase_url, supabase_key)
         print("✅ Successfully created Supabase client")
         
-        # Create a test record
-        test_id = str(uuid.uuid4())
-        test_data = {
-            "id": test_id,
-            "name": f"Test Project {test_id[:8]}",
-            "description": "Created by integration test",
-            "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
-        }
+        # Create the test records; ids and the timestamp are generated up front
+        # so every row goes to PostgREST in a single multi-row insert
+        created_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        test_ids = [uuid.uuid4().hex for _ in range(TEST_ROW_COUNT)]
+        test_rows = [
+            {
+                "id": test_id,
+                "name": f"Test Project {test_id[:8]}",
+                "description": "Created by integration test",
+                "created_at": created_at
+            }
+            for test_id in test_ids
+        ]
         
         # Test with 'projects' table - no schema prefix needed since api schema is exposed by default
-        print("Creating test record in projects table...")
+        print(f"Creating {len(test_rows)} test records in projects table...")
         
         try:
-            # Insert record into 'projects' table
-            print("Inserting test record...")
-            response = supabase.from_("projects").insert(test_data).execute()
+            # Insert records into 'projects' table
+            print("Inserting test records...")
+            response = supabase.from_("projects").insert(test_rows).execute()
             
-            if hasattr(response, 'data') and response.data:
-                inserted_data = response.data
-                print(f"✅ Successfully inserted test record: {json.dumps(inserted_data)}")
+            inserted_data = rows(response)
+            if inserted_data:
+                print(f"✅ Successfully inserted {len(inserted_data)} test records")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Inserted: %s", dumps(inserted_data))
                 
                 # Test query
-                print(f"Querying test record from projects...")
-                query_response = supabase.from_("projects").select("*").eq("id", test_id).execute()
+                print(f"Querying test records from projects...")
+                query_response = retry(supabase.from_("projects").select("*").in_("id", test_ids).execute)
                 
-                if query_response.data and len(query_response.data) > 0:
-                    print(f"✅ Successfully queried test record: {json.dumps(query_response.data[0])}")
+                queried = rows(query_response)
+                if len(queried) == len(test_ids):
+                    print("✅ Successfully queried test records")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Queried: %s", dumps(queried))
                     
-                    # Clean up - delete the test record
-                    print("Cleaning up test record...")
-                    delete_response = supabase.from_("projects").delete().eq("id", test_id).execute()
-                    print("✅ Successfully deleted test record")
+                    # Clean up - delete the test records
+                    print("Cleaning up test records...")
+                    delete_response = retry(supabase.from_("projects").delete().in_("id", test_ids).execute)
+                    print("✅ Successfully deleted test records")
                     
                     return True
                 else:
-                    print("❌ Failed to query test record")
+                    print("❌ Failed to query test records")
             else:
                 print(f"❌ Insertion may have failed: {response}")
                 
@@ -1,15 +1,19 @@
 import os
+import logging
+import time
+import hashlib
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-import jwt
 from jwt import PyJWTError
-from pydantic import BaseModel
-from typing import Optional
+from jwt.api_jwt import PyJWT
+from typing import NamedTuple, Optional
 
 # Load environment variables from .env file in the project root
 # load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 # Env vars should be loaded by main.py now
 
+logger = logging.getLogger(__name__)
+
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 # Define the expected audience for Supabase tokens
@@ -18,15 +22,56 @@ EXPECTED_AUDIENCE = 'authenticated'
 if not SECRET_KEY:
     raise EnvironmentError("JWT_SECRET_KEY environment variable not set.")
 
+# One decoder and one encoded key for the whole process instead of per request
+SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8")
+_ALGORITHMS = [ALGORITHM]
+_jwt = PyJWT(options={"require": ["exp", "sub", "aud"]})
+
 # OAuth2PasswordBearer will look for the token in the Authorization header
 # as 'Bearer <token>'
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token") # tokenUrl is dummy here, Supabase handles token generation
 
-class TokenData(BaseModel):
+# Verified token cache with TTL (Time To Live)
+# Structure: {sha256(token): (token_data, expires_at)}
+# Keyed by a digest so raw tokens are never held in memory past the request
+token_cache = {}
+TOKEN_CACHE_TTL_SECONDS = 30
+TOKEN_CACHE_MAX_ENTRIES = 10000
+
+class TokenData(NamedTuple):
     sub: Optional[str] = None # 'sub' usually contains the user ID
     email: Optional[str] = None
     aud: Optional[str] = None # Include aud if needed elsewhere
 
+def get_cached_token(cache_key: bytes) -> Optional[TokenData]:
+    """Get validated token data from cache if it exists and is not expired"""
+    cache_entry = token_cache.get(cache_key)
+    if cache_entry is not None:
+        token_data, expires_at = cache_entry
+        if time.time() < expires_at:
+            return token_data
+        token_cache.pop(cache_key, None)
+    return None
+
+def add_token_to_cache(cache_key: bytes, token_data: TokenData, token_exp: Optional[float]) -> None:
+    """Add validated token data to cache, never outliving the token's own exp"""
+    expires_at = time.time() + TOKEN_CACHE_TTL_SECONDS
+    if token_exp is not None:
+        expires_at = min(expires_at, token_exp)
+    
+    if len(token_cache) >= TOKEN_CACHE_MAX_ENTRIES:
+        clean_token_cache()
+    token_cache[cache_key] = (token_data, expires_at)
+
+def clean_token_cache() -> None:
+    """Remove expired entries, or everything if the cache is still full"""
+    current_time = time.time()
+    expired_keys = [key for key, (_, expires_at) in token_cache.items() if expires_at <= current_time]
+    for key in expired_keys:
+        token_cache.pop(key, None)
+    if len(token_cache) >= TOKEN_CACHE_MAX_ENTRIES:
+        token_cache.clear()
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -34,14 +79,21 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    print(f"Received token: {token[:10]}...") 
+    # Slice the token only when the record will actually be emitted
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received token prefix=%s...", token[:10])
+    
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached = get_cached_token(cache_key)
+    if cached is not None:
+        return cached
     
     try:
         # Decode the JWT from Supabase, verifying the audience
-        payload = jwt.decode(
+        payload = _jwt.decode(
             token, 
-            SECRET_KEY, 
-            algorithms=[ALGORITHM],
+            SECRET_KEY_BYTES, 
+            algorithms=_ALGORITHMS,
             audience=EXPECTED_AUDIENCE # Explicitly verify the audience
         )
         user_id: Optional[str] = payload.get("sub")
@@ -49,17 +101,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
         audience: Optional[str] = payload.get("aud")
         
         if user_id is None:
-            print("JWT Validation Error: 'sub' (user ID) claim not found in token.")
+            logger.debug("JWT Validation Error: 'sub' (user ID) claim not found in token.")
             raise credentials_exception
             
-        # Optional: Log success with user ID
-        print(f"Successfully validated token for user: {user_id} with aud: {audience}")
-        
         token_data = TokenData(sub=user_id, email=email, aud=audience)
+        add_token_to_cache(cache_key, token_data, payload.get("exp"))
         
     except PyJWTError as e:
         # Log the specific JWT error
-        print(f"JWT Validation Error: {e}")
+        logger.debug("JWT Validation Error: %s", e)
         raise credentials_exception
     
     return token_data
@@ -0,0 +1,25 @@
+"""
+One-time .env loading shared by the app and the backend scripts.
+
+Several modules used to call load_dotenv() at import, re-parsing the same file
+every time. Routing them through ensure_loaded() parses each file once per
+process; later calls are a cache hit.
+
+It lives outside app.config on purpose: importing anything from that package
+builds the app Settings, which requires every API key to be set, so scripts
+that only need Supabase (or that report missing variables) couldn't use it.
+"""
+
+from functools import lru_cache
+from typing import Optional, Union
+from pathlib import Path
+
+from dotenv import find_dotenv, load_dotenv
+
+
+@lru_cache(maxsize=None)
+def ensure_loaded(
+    dotenv_path: Optional[Union[str, Path]] = None, override: bool = False
+) -> bool:
+    """Load dotenv_path (or the nearest .env) once; returns whether anything was set"""
+    return load_dotenv(dotenv_path or find_dotenv(), override=override)
@@ -0,0 +1,54 @@
+"""
+Supabase credentials, headers and client shared by the setup scripts.
+
+Each script used to repeat the same load_dotenv() + os.getenv + missing-key
+check + create_client block. Everything here is built on first use and
+cached for the rest of the process.
+"""
+
+import os
+import sys
+import logging
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
+
+# Add parent directory to path to find app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.env import ensure_loaded
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def supabase_credentials() -> Tuple[str, str]:
+    """Return (SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY), exiting if either is unset"""
+    ensure_loaded()
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not url or not key:
+        logger.error("Missing Supabase URL or Service Role Key in environment variables.")
+        sys.exit(1)
+    return url, key
+
+
+@lru_cache(maxsize=1)
+def service_headers() -> Dict[str, str]:
+    """Headers for direct REST calls with the service-role key"""
+    _, key = supabase_credentials()
+    return {
+        "apikey": key,
+        "Authorization": f"Bearer {key}",
+        "Content-Type": "application/json",
+    }
+
+
+@lru_cache(maxsize=1)
+def get_supabase() -> Client:
+    """Return the process-wide service-role Supabase client"""
+    url, key = supabase_credentials()
+    logger.info(f"Initializing Supabase client with URL: {url}")
+    return create_client(url, key, options=ClientOptions(postgrest_client_timeout=10))
@@ -6,8 +6,6 @@ Test script to check Supabase connection and create the chat_messages table if n
 import os
 import logging
 import sys
-from supabase import create_client, Client
-from dotenv import load_dotenv
 
 # Configure logging
 logging.basicConfig(
@@ -15,28 +13,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+# Add the scripts directory to path to find the shared _supabase module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+from _supabase import get_supabase, supabase_credentials
 
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    logger.error("Missing Supabase URL or Service Role Key in environment variables.")
-    sys.exit(1)
+# Fail fast on missing credentials, before any work is done
+supabase_credentials()
 
 
 def main():
     try:
-        # Initialize the Supabase client
-        logger.info(f"Initializing Supabase client with URL: {SUPABASE_URL}")
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+        supabase = get_supabase()
 
         # Check if the chat_messages table exists
         logger.info("Checking if chat_messages table exists")
         result = (
             supabase.table("chat_messages")
-            .select("count", count="exact")
+            .select("id", count="exact")
             .limit(1)
             .execute()
         )
@@ -92,7 +86,7 @@ GRANT SELECT, INSERT ON public.chat_messages TO authenticated;
 
         # Test creating a project
         logger.info("Testing project creation/existence")
-        project_result = supabase.table("projects").select("*").limit(1).execute()
+        project_result = supabase.table("projects").select("id").limit(1).execute()
 
         if hasattr(project_result, "data") and project_result.data:
             logger.info(f"Found existing project: {project_result.data[0]['id']}")
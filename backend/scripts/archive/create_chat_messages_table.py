@@ -7,7 +7,8 @@ import os
 import sys
 import logging
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configure logging
 logging.basicConfig(
@@ -15,15 +16,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    logger.error("Missing Supabase URL or Service Role Key in environment variables.")
-    sys.exit(1)
+# Add the scripts directory to path to find the shared _supabase module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _supabase import service_headers, supabase_credentials
+
+SUPABASE_URL, _ = supabase_credentials()
+
+# One keep-alive session so the statements share a single connection
+SESSION = requests.Session()
+SESSION.headers.update(service_headers())
+# The DDL is idempotent, so POSTs are safe to retry on throttling/gateway errors
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=1,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=["POST"],
+            raise_on_status=False,
+        ),
+    ),
+)
 
 
 def create_chat_messages_table():
@@ -55,58 +72,52 @@ def create_chat_messages_table():
         ALTER TABLE public.chat_messages ENABLE ROW LEVEL SECURITY;
         """,
         """
-        CREATE POLICY chat_messages_select_policy ON public.chat_messages 
-        FOR SELECT 
-        USING (
-          auth.uid() = user_id 
-          OR 
-          project_id IN (SELECT id FROM public.projects WHERE is_public = true)
-          OR
-          project_id IN (SELECT id FROM public.projects WHERE user_id = auth.uid())
-        );
+        DO $$ BEGIN
+            CREATE POLICY chat_messages_select_policy ON public.chat_messages
+            FOR SELECT
+            USING (
+              auth.uid()::text = user_id
+              OR
+              project_id IN (SELECT id FROM public.projects WHERE is_public = true)
+              OR
+              project_id IN (SELECT id FROM public.projects WHERE user_id = auth.uid())
+            );
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$;
         """,
         """
-        CREATE POLICY chat_messages_insert_policy ON public.chat_messages 
-        FOR INSERT 
-        WITH CHECK (auth.uid() = user_id);
+        DO $$ BEGIN
+            CREATE POLICY chat_messages_insert_policy ON public.chat_messages
+            FOR INSERT
+            WITH CHECK (auth.uid()::text = user_id);
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$;
         """,
         """
         GRANT SELECT, INSERT ON public.chat_messages TO authenticated;
         """,
     ]
 
-    # Headers for the API request
-    headers = {
-        "apikey": SUPABASE_SERVICE_ROLE_KEY,
-        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
-        "Content-Type": "application/json",
-    }
-
-    success_count = 0
+    # Send every statement in one request instead of one round-trip each, as a
+    # single transaction so a failure can't leave a half-applied schema
+    bulk_sql = "BEGIN;\n" + "\n".join(sql.strip() for sql in tables) + "\nCOMMIT;"
     total_statements = len(tables)
+    success_count = 0
+
+    try:
+        logger.info(f"Executing {total_statements} SQL statements")
+
+        response = SESSION.post(f"{SUPABASE_URL}/rest/v1/sql", json={"query": bulk_sql})
 
-    for i, sql in enumerate(tables):
-        try:
-            logger.info(f"Executing SQL statement {i+1} of {total_statements}")
-
-            # Make the API request
-            response = requests.post(
-                f"{SUPABASE_URL}/rest/v1/sql", headers=headers, json={"query": sql}
-            )
-
-            # Check if the request was successful
-            if response.status_code < 400:
-                logger.info(f"Statement {i+1} executed successfully")
-                success_count += 1
-            else:
-                logger.error(f"Error executing statement {i+1}: {response.text}")
-
-                # If the error is because the table already exists, continue
-                if "already exists" in response.text:
-                    logger.warning("Table or index already exists, continuing...")
-                    success_count += 1
-        except Exception as e:
-            logger.error(f"Exception executing statement {i+1}: {str(e)}")
+        # Check if the request was successful
+        if response.status_code < 400:
+            success_count = total_statements
+        else:
+            # Every statement is idempotent, so an error here is a real one and
+            # the whole batch, table included, has been rolled back
+            logger.error(f"Error executing SQL statements: {response.text}")
+    except Exception as e:
+        logger.error(f"Exception executing SQL statements: {str(e)}")
 
     logger.info(
         f"Table creation complete. Successful statements: {success_count}/{total_statements}"
@@ -7,80 +7,73 @@ It uses the Supabase PostgreSQL connection to execute the SQL commands.
 
 Requirements:
 - A Supabase project with the proper credentials
-- Environment variables set for SUPABASE_URL and SUPABASE_SERVICE_KEY
+- Environment variables set for SUPABASE_URL and SUPABASE_DB_PASSWORD
 
 Usage:
 python create_nova_tables.py
 """
 
 import os
+import re
 import sys
+import textwrap
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dotenv import load_dotenv
-import requests
 import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from psycopg2.pool import ThreadedConnectionPool
 
-# Load environment variables from .env file
-load_dotenv()
+# Add the backend directory to path to find the app module
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from app.utils.env import ensure_loaded
+
+# Load environment variables from .env file, once per process
+ensure_loaded()
 
 # Get Supabase credentials from environment variables
 SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 DB_PASSWORD = os.getenv("SUPABASE_DB_PASSWORD")
 
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+if not SUPABASE_URL or not DB_PASSWORD:
     print(
-        "Error: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set in environment variables or .env file"
+        "Error: SUPABASE_URL and SUPABASE_DB_PASSWORD must be set in environment variables or .env file"
     )
     sys.exit(1)
 
 # Extract host and database information from Supabase URL
 # Example: https://project-ref.supabase.co
 project_ref = SUPABASE_URL.split("//")[1].split(".")[0]
-host = f"{project_ref}.supabase.co"
 database = "postgres"
-user = "postgres"
-port = 5432
 
+# Connecting through Supavisor, Supabase's connection pooler, skips backend
+# startup. Set SUPABASE_POOLER_HOST (e.g. aws-0-<region>.pooler.supabase.com)
+# to use it. Session mode on port 5432 is the default, since transaction mode
+# (6543) rejects some of the DDL below.
+POOLER_HOST = os.getenv("SUPABASE_POOLER_HOST")
+if POOLER_HOST:
+    host = POOLER_HOST
+    user = f"postgres.{project_ref}"
+    port = int(os.getenv("SUPABASE_POOLER_PORT", "5432"))
+else:
+    host = f"{project_ref}.supabase.co"
+    user = "postgres"
+    port = 5432
 
-# Function to get database connection information from Supabase
-def get_db_connection_info():
-    endpoint = f"{SUPABASE_URL}/rest/v1/"
-    headers = {
-        "apikey": SUPABASE_SERVICE_KEY,
-        "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
-    }
-
-    try:
-        response = requests.get(endpoint, headers=headers)
-        if response.status_code == 200:
-            print("Successfully connected to Supabase API")
-            return True
-        else:
-            print(
-                f"Error connecting to Supabase API: {response.status_code} {response.text}"
-            )
-            return False
-    except Exception as e:
-        print(f"Exception while connecting to Supabase: {e}")
-        return False
+# Indexes on different tables don't conflict, so they are built concurrently
+INDEX_WORKERS = 4
 
 
 # Function to create database connection
 def create_db_connection():
     try:
-        # Verify API connection first
-        if not get_db_connection_info():
-            print("Could not verify Supabase API connection. Exiting.")
-            return None
-
-        # Try to connect using direct PostgreSQL connection
+        # Connect straight to PostgreSQL; bad credentials fail here with a clear
+        # OperationalError, so no separate REST round-trip is needed to check them
         conn = psycopg2.connect(
             host=host, database=database, user=user, password=DB_PASSWORD, port=port
         )
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
         print("Successfully connected to PostgreSQL database")
         return conn
     except Exception as e:
@@ -521,24 +514,72 @@ TRIGGER_COMMANDS = [
 ]
 
 
+# Dedent and strip the command text once at import, so the indentation of the
+# triple-quoted strings above isn't sent to the server with every statement
+SQL_COMMANDS, INDEX_COMMANDS, RLS_COMMANDS, TRIGGER_COMMANDS = (
+    [textwrap.dedent(command).strip() for command in commands]
+    for commands in (SQL_COMMANDS, INDEX_COMMANDS, RLS_COMMANDS, TRIGGER_COMMANDS)
+)
+
+
+_INDEX_NAME = re.compile(r"CREATE INDEX IF NOT EXISTS (\w+)", re.IGNORECASE)
+_INDEX_TABLE = re.compile(r"\bON (\w+)", re.IGNORECASE)
+
+
+def missing_index_commands(conn, commands):
+    """Drop the CREATE INDEX commands whose index already exists"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT indexname FROM pg_indexes WHERE schemaname = 'public'")
+    existing = {row[0] for row in cursor.fetchall()}
+    cursor.close()
+    conn.rollback()  # end the read-only transaction the SELECT opened
+    return [c for c in commands if _INDEX_NAME.search(c).group(1) not in existing]
+
+
 def execute_commands(conn, commands, command_type):
     cursor = conn.cursor()
     success_count = 0
     error_count = 0
+    total = len(commands)
 
     print(f"\n=== Executing {command_type} Commands ===")
-    for i, command in enumerate(commands):
-        try:
-            print(f"Executing {command_type} command {i+1}/{len(commands)}...")
-            cursor.execute(command)
-            success_count += 1
-        except Exception as e:
-            print(f"Error executing command: {e}")
-            print(f"Command was: {command[:100]}...")
-            error_count += 1
-
-            # Continue with other commands even if some fail
-            continue
+    if not commands:
+        print(f"No {command_type} commands to run")
+        cursor.close()
+        return success_count, error_count
+
+    # First try the whole group in one round-trip and one commit, so the phase
+    # is committed (and its WAL flushed) once. If that batch fails it is rolled
+    # back and the per-command fallback below applies whatever commands succeed.
+    try:
+        print(f"Executing {total} {command_type} commands in one batch...")
+        cursor.execute("\n".join(commands))
+        conn.commit()
+        success_count = total
+    except Exception as e:
+        conn.rollback()
+        print(f"Batch failed ({e}), retrying commands one by one...")
+
+    # On failure, fall back to one command at a time to find the bad ones. Each
+    # runs under a savepoint so a failure only undoes that command (e.g. a
+    # DROP POLICY is restored if its CREATE POLICY fails), then commit once.
+    if success_count == 0:
+        for i, command in enumerate(commands):
+            try:
+                print(f"Executing {command_type} command {i+1}/{total}...")
+                cursor.execute("SAVEPOINT command")
+                cursor.execute(command)
+                cursor.execute("RELEASE SAVEPOINT command")
+                success_count += 1
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT command")
+                print(f"Error executing command: {e}")
+                print(f"Command was: {command[:100]}...")
+                error_count += 1
+
+                # Continue with other commands even if some fail
+                continue
+        conn.commit()
 
     cursor.close()
     print(
@@ -547,6 +588,49 @@ def execute_commands(conn, commands, command_type):
     return success_count, error_count
 
 
+def _execute_on_pool(pool, commands, command_type):
+    conn = pool.getconn()
+    try:
+        return execute_commands(conn, commands, command_type)
+    finally:
+        pool.putconn(conn)
+
+
+def execute_index_commands(commands):
+    """Run each table's CREATE INDEX batch on its own pooled connection"""
+    by_table = {}
+    for command in commands:
+        table = _INDEX_TABLE.search(command).group(1)
+        by_table.setdefault(table, []).append(command)
+    if not by_table:
+        print("No Index Creation commands to run")
+        return 0, 0
+
+    workers = min(INDEX_WORKERS, len(by_table))
+    pool = ThreadedConnectionPool(
+        1,
+        workers,
+        host=host,
+        database=database,
+        user=user,
+        password=DB_PASSWORD,
+        port=port,
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _execute_on_pool, pool, table_commands, f"Index Creation ({table})"
+                )
+                for table, table_commands in by_table.items()
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        pool.closeall()
+
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
 def main():
     print(
         f"Nova Database Schema Creation - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
@@ -571,9 +655,10 @@ def main():
 
         # 2. Create indexes
         print("\n=== Creating Indexes ===")
-        index_success, index_errors = execute_commands(
-            conn, INDEX_COMMANDS, "Index Creation"
-        )
+        # One catalog read instead of re-sending every index that already exists
+        index_commands = missing_index_commands(conn, INDEX_COMMANDS)
+        index_existing = len(INDEX_COMMANDS) - len(index_commands)
+        index_success, index_errors = execute_index_commands(index_commands)
 
         # 3. Setup RLS policies
         print("\n=== Setting up RLS Policies ===")
@@ -591,7 +676,10 @@ def main():
         # Summary
         print("\n=== Schema Creation Summary ===")
         print(f"Tables: {table_success} created, {table_errors} failed")
-        print(f"Indexes: {index_success} created, {index_errors} failed")
+        print(
+            f"Indexes: {index_success} created, {index_existing} already existed, "
+            f"{index_errors} failed"
+        )
         print(f"RLS Policies: {rls_success} created, {rls_errors} failed")
         print(f"Triggers: {trigger_success} created, {trigger_errors} failed")
         print(f"Total execution time: {duration:.2f} seconds")
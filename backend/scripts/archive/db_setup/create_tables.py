@@ -8,6 +8,7 @@ import os
 import sys
 import logging
 import argparse
+import re
 from typing import List, Dict, Any, Optional
 from abc import ABC, abstractmethod
 from dotenv import load_dotenv
@@ -22,6 +23,21 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Tokens of a SQL script, compiled once. Quoted strings, dollar-quoted bodies
+# and comments are matched whole so a ";" inside them never ends a statement.
+_SQL_TOKEN = re.compile(
+    r"""
+      '(?:[^']|'')*'                                # string literal
+    | "(?:[^"]|"")*"                                # quoted identifier
+    | (\$(?:[A-Za-z_][A-Za-z_0-9]*)?\$)[\s\S]*?\1   # dollar-quoted body
+    | (?P<comment>--[^\n]*|/\*[\s\S]*?\*/)          # comment
+    | (?P<end>;)                                    # statement terminator
+    | [^'"$;/-]+                                    # plain text
+    | .                                             # anything else
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
 
 # Database adapter abstract base class
 class DatabaseAdapter(ABC):
@@ -87,9 +103,19 @@ class DatabaseAdapter(ABC):
             return False
 
     def _split_sql_script(self, script: str) -> List[str]:
-        """Split a SQL script into individual statements"""
-        # Basic splitting by semicolon - may need refinement for complex scripts
-        return [s.strip() for s in script.split(";") if s.strip()]
+        """Split a SQL script into individual statements, dropping comments"""
+        statements = []
+        current = []
+        for match in _SQL_TOKEN.finditer(script):
+            if match.group("end"):
+                statements.append("".join(current).strip())
+                current = []
+            elif match.group("comment"):
+                current.append(" ")
+            else:
+                current.append(match.group())
+        statements.append("".join(current).strip())
+        return [s for s in statements if s]
 
 
 # PostgreSQL adapter
@@ -8,8 +8,10 @@ import os
 import sys
 import logging
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(
@@ -17,15 +19,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    logger.error("Missing Supabase URL or Service Role Key in environment variables.")
-    sys.exit(1)
+# Add the scripts directory to path to find the shared _supabase module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from _supabase import service_headers, supabase_credentials
+
+SUPABASE_URL, _ = supabase_credentials()
+
+# One keep-alive session for every request, sized for the --jobs thread pool
+SESSION = requests.Session()
+SESSION.headers.update(service_headers())
+# Migrations need not be re-runnable, so only retry POSTs the server rejected
+# before running them (throttled/unavailable), never after a read failure
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=5,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=[429, 503],
+            allowed_methods=["POST"],
+            raise_on_status=False,
+        ),
+    ),
+)
 
 
 def execute_sql_file(file_path):
@@ -36,19 +56,10 @@ def execute_sql_file(file_path):
 
         logger.info(f"Executing SQL file: {file_path}")
 
-        # Prepare the request to Supabase SQL API
-        headers = {
-            "apikey": SUPABASE_SERVICE_ROLE_KEY,
-            "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
-            "Content-Type": "application/json",
-        }
-
         data = {"query": sql_content}
 
         # Execute the SQL
-        response = requests.post(
-            f"{SUPABASE_URL}/rest/v1/rpc/exec_sql", headers=headers, json=data
-        )
+        response = SESSION.post(f"{SUPABASE_URL}/rest/v1/rpc/exec_sql", json=data)
 
         if response.status_code >= 400:
             logger.error(f"Error executing SQL file {file_path}: {response.text}")
@@ -67,6 +78,13 @@ def main():
     parser = argparse.ArgumentParser(description="Apply database migrations")
     parser.add_argument("--file", help="Apply a specific migration file")
     parser.add_argument("--all", action="store_true", help="Apply all migration files")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Apply up to this many files concurrently with --all "
+        "(only for migrations that do not depend on each other)",
+    )
 
     args = parser.parse_args()
 
@@ -98,15 +116,16 @@ def main():
         migration_files = [f for f in os.listdir(migrations_dir) if f.endswith(".sql")]
         migration_files.sort()  # Apply in alphabetical order
 
-        success_count = 0
-        fail_count = 0
+        file_paths = [os.path.join(migrations_dir, f) for f in migration_files]
+
+        if args.jobs > 1:
+            with ThreadPoolExecutor(max_workers=min(args.jobs, 8)) as executor:
+                results = list(executor.map(execute_sql_file, file_paths))
+        else:
+            results = [execute_sql_file(path) for path in file_paths]
 
-        for file_name in migration_files:
-            file_path = os.path.join(migrations_dir, file_name)
-            if execute_sql_file(file_path):
-                success_count += 1
-            else:
-                fail_count += 1
+        success_count = sum(results)
+        fail_count = len(results) - success_count
 
         logger.info(
             f"Migration complete. Success: {success_count}, Failed: {fail_count}"
@@ -1,21 +1,26 @@
 #!/usr/bin/env python3
 import os
 import sys
-import uuid
-from dotenv import load_dotenv
 from supabase import create_client, Client
-from passlib.context import CryptContext
+import bcrypt
+
+# Add parent directory to path to find app module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.env import ensure_loaded
 
 # Load environment variables
-load_dotenv()
+ensure_loaded()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: cost 10 is plenty for a throwaway test account, and calling
+# bcrypt directly skips passlib's scheme negotiation. The $2b$ hashes it makes
+# still verify through passlib's bcrypt handler.
+BCRYPT_ROUNDS = 10
 
 
 def get_password_hash(password):
     """Hash a password for storing."""
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
 
 def create_test_user():
@@ -41,44 +46,23 @@ def create_test_user():
         supabase = create_client(supabase_url, supabase_key)
         print("✅ Connected to Supabase")
 
-        # Check if user already exists
-        print(f"Checking if user {email} already exists...")
-        response = supabase.table("users").select("*").eq("email", email).execute()
-
-        if response.data and len(response.data) > 0:
-            print(f"⚠️ User with email {email} already exists")
-            user = response.data[0]
-            print(f"User ID: {user.get('id')}")
-
-            # Update user's password if requested
-            update = input("Update password for this user? (y/n): ")
-            if update.lower() == "y":
-                hashed_password = get_password_hash(password)
-                supabase.table("users").update({"password_hash": hashed_password}).eq(
-                    "id", user["id"]
-                ).execute()
-                print("✅ Password updated")
-
-            return
-
-        # Create new user
-        print(f"Creating new user {email}...")
-        user_id = str(uuid.uuid4())
-        hashed_password = get_password_hash(password)
-
+        # Insert the user, or just reset the password of an existing one, in a
+        # single INSERT ... ON CONFLICT (email) DO UPDATE. id, plan and
+        # created_at are left to the column defaults so an existing row keeps them.
+        print(f"Creating or updating user {email}...")
         user_data = {
-            "id": user_id,
             "email": email,
-            "password_hash": hashed_password,
-            "plan": "free",
-            "created_at": "now()",
+            "password_hash": get_password_hash(password),
         }
 
-        response = supabase.table("users").insert(user_data).execute()
+        response = (
+            supabase.table("users").upsert(user_data, on_conflict="email").execute()
+        )
 
         if response.data and len(response.data) > 0:
-            print("✅ User created successfully:")
+            print("✅ User saved successfully:")
             user = response.data[0]
+            user_id = user["id"]
             print(f"User ID: {user.get('id')}")
             print(f"Email: {user.get('email')}")
 
@@ -104,7 +88,7 @@ def create_test_user():
                     print(f"Project ID: {project.get('id')}")
                     print(f"Name: {project.get('project_name')}")
         else:
-            print("❌ Failed to create user")
+            print("❌ Failed to save user")
 
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -225,24 +225,23 @@ def setup_database():
         FOR DELETE USING (auth.uid() = user_id);
     """
     
-    # Table creation status
-    tables_created = True
+    # All table DDL goes in one request and one transaction, so a run either
+    # creates every table or leaves the schema untouched
+    tables_sql = "\n".join([
+        "BEGIN;",
+        user_profiles_table,
+        projects_table,
+        documents_table,
+        chat_sessions_table,
+        chat_messages_table,
+        shared_objects_table,
+        "COMMIT;",
+    ])
+    tables_created = execute_sql(tables_sql, "table creation")[0]
     
-    # Execute table creation statements
-    if not execute_sql(user_profiles_table, "user_profiles table creation")[0]:
-        tables_created = False
-    if not execute_sql(projects_table, "projects table creation")[0]:
-        tables_created = False
-    if not execute_sql(documents_table, "documents table creation")[0]:
-        tables_created = False
-    if not execute_sql(chat_sessions_table, "chat_sessions table creation")[0]:
-        tables_created = False
-    if not execute_sql(chat_messages_table, "chat_messages table creation")[0]:
-        tables_created = False
-    if not execute_sql(shared_objects_table, "shared_objects table creation")[0]:
-        tables_created = False
-    
-    # Execute RLS statements
+    # RLS statements stay outside the table transaction, one request per block:
+    # a multi-statement request is all-or-nothing, so a failing policy block
+    # must not roll back the tables or the ENABLE ROW LEVEL SECURITY statements
     execute_sql(enable_rls, "enabling RLS")
     execute_sql(service_role_bypass, "setting up service_role bypass")
     execute_sql(user_policies, "setting up user policies")
@@ -76,7 +76,14 @@ async def test_vector_store():
         )
         
         print(f"Upsert result: {result}")
-        
+
+        # Wait for the upserted vectors to become visible in the index
+        indexed = await vector_service.wait_for_upsert(
+            result.get("upserted_count", 0),
+            namespace=namespace
+        )
+        print(f"Vectors indexed: {indexed}")
+
         # 4. Get vector store stats
         print("\nChecking vector store stats...")
         stats = await vector_service.describe_index_stats()